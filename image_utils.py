@@ -1,5 +1,13 @@
+from functools import lru_cache
+
 from PIL import Image, ImageFont, ImageDraw
 
+# Size of the final poster at full resolution.
+POSTER_SIZE: tuple[int, int] = (2400, 2940)
+
+# Draw object used to measure text, shared by every measurement instead of creating one each time.
+MEASURE_DRAW = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
 
 def center_position(final_poster_width: float, obj_bbox: tuple[float, float, float, float]) -> float:
     """
@@ -37,6 +45,21 @@ def add_bboxes(
     return left, top, right, bottom
 
 
+@lru_cache(maxsize=64)
+def load_font(font_path: str, font_size: int) -> ImageFont.FreeTypeFont:
+    """
+    Load a TrueType font at a given size, caching the result so each face is only parsed once.
+
+    Args:
+        font_path (str): The path to the font file.
+        font_size (int): The size of the font.
+
+    Returns:
+        ImageFont.FreeTypeFont: The loaded font object.
+    """
+    return ImageFont.truetype(font_path, font_size)
+
+
 def get_adaptive_font(text: str, font_path: str, max_width: int,
                       initial_font_size: int = 244) -> ImageFont.FreeTypeFont:
     """
@@ -46,40 +69,62 @@ def get_adaptive_font(text: str, font_path: str, max_width: int,
         text (str): The text to be rendered.
         font_path (str): The path to the font file.
         max_width (int): The maximum width the text should fit within.
-        initial_font_size (int): The starting font size to test (default is 244).
+        initial_font_size (int): The largest font size to test (default is 244).
 
     Returns:
         ImageFont.FreeTypeFont: A font object with the appropriate size to fit within max_width.
     """
-    # Start with the initial font size.
-    font_size = initial_font_size
-    font = ImageFont.truetype(font_path, font_size)
+    # Search between the smallest allowed font size and the initial font size.
+    low, high = 10, initial_font_size  # Avoid too small fonts.
+
+    # Text width grows with font size, so binary search the largest size that fits within the max width.
+    while low < high:
+        middle = (low + high + 1) // 2
+        if MEASURE_DRAW.textbbox((0, 0), text, font=load_font(font_path, middle))[2] <= max_width:
+            low = middle
+        else:
+            high = middle - 1
+
+    return load_font(font_path, low)
+
+
+@lru_cache(maxsize=32)
+def resolve_title_font_size(title_text: str, scale_factor: int = 1) -> int:
+    """
+    Determine the title font size for a poster, caching the result so it is only searched once per title.
 
-    # Create a temporary draw object to measure text width.
-    with Image.new("RGBA", (1, 1)) as temp_image:
-        draw = ImageDraw.Draw(temp_image)
+    Args:
+        title_text (str): Title text for the movie poster.
+        scale_factor (int): Factor by which the poster is scaled down from full resolution (default is 1).
 
-        # Reduce font size until the text width is within the max width.
-        while draw.textbbox((0, 0), text, font=font)[2] > max_width and font_size > 10:  # Avoid too small fonts.
-            font_size -= 1
-            font = ImageFont.truetype(font_path, font_size)
+    Returns:
+        int: The largest font size that lets the title fit within the poster width.
+    """
+    # Define maximum width for the title.
+    max_title_width = (POSTER_SIZE[0] - 200) // scale_factor  # leave some padding.
 
-    return font
+    return get_adaptive_font(title_text, "Gloock/Gloock-Regular.ttf", max_title_width, 244 // scale_factor).size
 
 
 def smart_resize(image_path: str, target_size: tuple[int, int]) -> Image:
     """
-    Resize an image to fit within a target size, preserving the aspect ratio and centering the result.
+    Resize an image to fill a target size, preserving the aspect ratio and cropping the overflow around the center.
 
     Args:
         image_path (str): Path to the image file.
         target_size (tuple[int, int]): The target (width, height) for the resized image.
 
     Returns:
-        Image: The resized image centered on a canvas of target_size with a transparent background.
+        Image: The resized and centered image of target_size in RGBA mode.
     """
-    # Load the image.
-    image = Image.open(image_path).convert("RGBA")
+    # Load the image, letting the JPEG decoder downscale it by a power of two during decoding
+    # while keeping it at least twice the target size in both dimensions for the final resize.
+    image = Image.open(image_path)
+    image.draft("RGB", (target_size[0] * 2, target_size[1] * 2))
+
+    # RGB images are resized as is, with 3 channels instead of 4, and only gain alpha once resized.
+    if image.mode != "RGB":
+        image = image.convert("RGBA")
 
     # Calculate the scale factors for both dimensions.
     scale_width = target_size[0] / image.width
@@ -88,74 +133,99 @@ def smart_resize(image_path: str, target_size: tuple[int, int]) -> Image:
     # Use the maximum scale factor to ensure the image fills the target size.
     scale = max(scale_width, scale_height)
 
-    # Calculate new dimensions based on the scale factor.
-    new_width = int(image.width * scale)
-    new_height = int(image.height * scale)
+    # Calculate the centered region of the image that fills the target size once scaled.
+    source_width = target_size[0] / scale
+    source_height = target_size[1] / scale
+    x_offset = (image.width - source_width) / 2
+    y_offset = (image.height - source_height) / 2
 
-    # Resize the image with aspect ratio preserved.
-    resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    # Resize only that region, so that the overflow is never resampled nor needs a canvas.
+    # When downscaling, first reduce the image by an integer factor with a fast box filter,
+    # keeping it at least three times the target size for an output indistinguishable from plain LANCZOS.
+    resized_image = image.resize(
+        target_size,
+        Image.Resampling.LANCZOS,
+        box=(x_offset, y_offset, x_offset + source_width, y_offset + source_height),
+        reducing_gap=3.0)
 
-    # Create a blank canvas with the target size.
-    canvas = Image.new("RGBA", target_size, (0, 0, 0, 0))
+    # Add an opaque alpha channel to RGB images.
+    if resized_image.mode != "RGBA":
+        resized_image.putalpha(255)
 
-    # Calculate the position to paste the resized image to be centered.
-    x_offset = (target_size[0] - new_width) // 2
-    y_offset = (target_size[1] - new_height) // 2
+    return resized_image
 
-    # Paste the resized image onto the canvas.
-    canvas.paste(resized_image, (x_offset, y_offset))
 
-    return canvas
+@lru_cache(maxsize=8)
+def load_blur(blur_image_path: str, target_size: tuple[int, int]) -> Image:
+    """
+    Load the blur image and resize it to the target size, caching the result for subsequent posters.
 
+    The blur carries no fine detail, so a bilinear filter is used instead of the default bicubic one.
+    The returned image is shared between calls and must not be modified.
 
-def create_image_poster(
-        title_text: str,
-        poster_image_path: str,
-        output_image_path: str,
-        blur_image_path: str) -> None:
+    Args:
+        blur_image_path (str): Path to the image used for the blur effect.
+        target_size (tuple[int, int]): The target (width, height) for the resized blur.
+
+    Returns:
+        Image: The resized blur image in RGBA mode.
     """
-    Create a movie poster with a title and blur effect.
+    with Image.open(blur_image_path) as blur:
+        # Only convert the blur if it is not already RGBA, to avoid a needless copy.
+        if blur.mode != "RGBA":
+            blur = blur.convert("RGBA")
+
+        return blur.resize(target_size, Image.Resampling.BILINEAR)
+
+
+def mask_to_overlay(mask: Image) -> tuple[Image, tuple[int, int]]:
+    """
+    Turn a text mask into a white overlay using the mask as alpha, cropped to the drawn text.
+
+    Compositing the overlay onto a poster gives the same result as drawing the text on it directly in white.
 
     Args:
-        title_text (str): Title text for the movie poster.
-        poster_image_path (str): Path to the main poster image.
-        output_image_path (str): Path where the final poster image will be saved.
-        blur_image_path (str): Path to the image used for the blur effect.
+        mask (Image): The mask in L mode, with the text drawn in white on black.
 
     Returns:
-        None
+        tuple[Image, tuple[int, int]]: The overlay image in RGBA mode and the position to composite it at.
     """
+    text_bbox = mask.getbbox()
 
-    # Load and resize images.
-    target_size = (2400, 2940)
-    poster = smart_resize(poster_image_path, target_size)
-    blur = Image.open(blur_image_path).resize((2400, 2940)).convert("RGBA")
+    # Nothing was drawn, so return an empty overlay.
+    if text_bbox is None:
+        return Image.new("RGBA", (1, 1), (255, 255, 255, 0)), (0, 0)
 
-    # Calculate the offset for the blur to end near the center of the poster.
-    poster_height = poster.height
-    blur_height = blur.height
-    offset_y: int = int(poster_height // 1.2 - blur_height)
+    overlay = Image.new("RGBA", (text_bbox[2] - text_bbox[0], text_bbox[3] - text_bbox[1]), (255, 255, 255, 0))
+    overlay.putalpha(mask.crop(text_bbox))
 
-    # Create a blank image to hold the modified blur with offset.
-    blur_with_offset = Image.new("RGBA", poster.size, (0, 0, 0, 0))
+    return overlay, text_bbox[:2]
 
-    # Paste the blur image onto the blank canvas at the calculated offset.
-    blur_with_offset.paste(blur, (0, -offset_y))
 
-    # Composite the poster with the blur effect starting from the specified offset.
-    final_poster = Image.alpha_composite(poster, blur_with_offset)
+@lru_cache(maxsize=8)
+def load_static_overlay(scale_factor: int = 1) -> tuple[Image, tuple[int, int]]:
+    """
+    Render the text shared by every poster ("ciné", "fil", room and day) once, caching the result.
 
-    # Prepare to draw on the final image.
-    draw = ImageDraw.Draw(final_poster)
+    The returned image is shared between calls and must not be modified.
 
-    # Define maximum width for the title.
-    max_title_width = poster.width - 200  # leave some padding.
+    Args:
+        scale_factor (int): Factor by which the poster is scaled down from full resolution (default is 1).
+
+    Returns:
+        tuple[Image, tuple[int, int]]: The overlay image in RGBA mode and the position to composite it at.
+    """
+    poster_size = (POSTER_SIZE[0] // scale_factor, POSTER_SIZE[1] // scale_factor)
+    poster_width, poster_height = poster_size
+
+    # Create a mask to draw the text on.
+    mask = Image.new("L", poster_size, 0)
+    draw = ImageDraw.Draw(mask)
 
     # Load fonts.
-    title_font = get_adaptive_font(title_text, "Gloock/Gloock-Regular.ttf", max_title_width)
-    gloock_font = ImageFont.truetype("Gloock/Gloock-Regular.ttf", 126)
-    charmonman_font = ImageFont.truetype("Charmonman/Charmonman-Bold.ttf", 126)
-    small_font = ImageFont.truetype("Gloock/Gloock-Regular.ttf", 44)
+    gloock_font = load_font("Gloock/Gloock-Regular.ttf", 126 // scale_factor)
+    charmonman_font = load_font("Charmonman/Charmonman-Bold.ttf", 126 // scale_factor)
+    small_font = load_font("Gloock/Gloock-Regular.ttf", 44 // scale_factor)
 
     # Define text.
     cine: str = "ciné"
@@ -164,15 +234,12 @@ def create_image_poster(
     day_info: str = "mardi 20h30"
 
     # Get text bounding boxes for centering.
-    title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
     cine_bbox = draw.textbbox((0, 0), cine, font=gloock_font)
     fil_bbox = draw.textbbox((0, 0), fil, font=charmonman_font)
     room_bbox = draw.textbbox((0, 0), room_info, font=small_font)
     day_bbox = draw.textbbox((0, 0), day_info, font=small_font)
 
     # Calculate positions.
-    title_position = (center_position(final_poster.width, title_bbox), final_poster.height - (final_poster.height // 4))
-
     cine_width = cine_bbox[2] - cine_bbox[0]
     fil_width = fil_bbox[2] - fil_bbox[0]
     cinefil_width = cine_width + fil_width
@@ -181,22 +248,101 @@ def create_image_poster(
     cinefil_height = cine_height + fil_height
 
     cinefil_bbox = add_bboxes(cine_bbox, fil_bbox)
-    cinefil_start_position = center_position(final_poster.width, cinefil_bbox)
+    cinefil_start_position = center_position(poster_width, cinefil_bbox)
 
     cine_position = (cinefil_start_position,
-                     final_poster.height - 450 + (cine_height // 4))
+                     poster_height - 450 // scale_factor + (cine_height // 4))
     fil_position = (
-        cinefil_start_position + cine_bbox[2], final_poster.height - 450)
+        cinefil_start_position + cine_bbox[2], poster_height - 450 // scale_factor)
 
     room_position = (cine_position[0] + room_bbox[2] + (cinefil_width // 1.3), cine_position[1] + (cinefil_height // 4))
     day_position = (cine_position[0] - day_bbox[2] - (cinefil_width // 3), cine_position[1] + (cinefil_height // 4))
 
-    # Draw text on the poster.
-    draw.text(title_position, title_text, font=title_font, fill="white")
-    draw.text(cine_position, cine, font=gloock_font, fill="white")
-    draw.text(fil_position, fil, font=charmonman_font, fill="white")
-    draw.text(room_position, room_info, font=small_font, fill="white")
-    draw.text(day_position, day_info, font=small_font, fill="white")
+    # Draw text on the mask.
+    draw.text(cine_position, cine, font=gloock_font, fill=255)
+    draw.text(fil_position, fil, font=charmonman_font, fill=255)
+    draw.text(room_position, room_info, font=small_font, fill=255)
+    draw.text(day_position, day_info, font=small_font, fill=255)
+
+    return mask_to_overlay(mask)
+
+
+@lru_cache(maxsize=8)
+def load_title_overlay(title_text: str, title_font_size: int, scale_factor: int = 1) -> tuple[Image, tuple[int, int]]:
+    """
+    Render the title of a poster once, caching the result for the other posters of the same movie.
+
+    The returned image is shared between calls and must not be modified.
+
+    Args:
+        title_text (str): Title text for the movie poster.
+        title_font_size (int): Font size of the title, as returned by resolve_title_font_size for the same scale.
+        scale_factor (int): Factor by which the poster is scaled down from full resolution (default is 1).
+
+    Returns:
+        tuple[Image, tuple[int, int]]: The overlay image in RGBA mode and the position to composite it at.
+    """
+    poster_size = (POSTER_SIZE[0] // scale_factor, POSTER_SIZE[1] // scale_factor)
+    poster_width, poster_height = poster_size
+
+    # Load font.
+    title_font = load_font("Gloock/Gloock-Regular.ttf", title_font_size)
+
+    # Get text bounding box for centering.
+    title_bbox = MEASURE_DRAW.textbbox((0, 0), title_text, font=title_font)
+
+    # Calculate position.
+    title_position = (center_position(poster_width, title_bbox), poster_height - (poster_height // 4))
+
+    # Draw text on a mask.
+    mask = Image.new("L", poster_size, 0)
+    ImageDraw.Draw(mask).text(title_position, title_text, font=title_font, fill=255)
+
+    return mask_to_overlay(mask)
+
+
+def create_image_poster(
+        title_text: str,
+        title_font_size: int,
+        poster_image_path: str,
+        output_image_path: str,
+        blur_image_path: str,
+        scale_factor: int = 1) -> None:
+    """
+    Create a movie poster with a title and blur effect.
+
+    Args:
+        title_text (str): Title text for the movie poster.
+        title_font_size (int): Font size of the title, as returned by resolve_title_font_size for the same scale.
+        poster_image_path (str): Path to the main poster image.
+        output_image_path (str): Path where the final poster image will be saved.
+        blur_image_path (str): Path to the image used for the blur effect.
+        scale_factor (int): Factor by which the poster is scaled down from full resolution (default is 1).
+            A factor of 2 renders a 1200x1470 poster, with a quarter of the pixels to process.
+
+    Returns:
+        None
+    """
+
+    # Load and resize images.
+    target_size = (POSTER_SIZE[0] // scale_factor, POSTER_SIZE[1] // scale_factor)
+    poster = smart_resize(poster_image_path, target_size)
+    blur = load_blur(blur_image_path, target_size)
+
+    # Calculate the offset for the blur to end near the center of the poster.
+    poster_height = poster.height
+    blur_height = blur.height
+    offset_y: int = int(poster_height // 1.2 - blur_height)
+
+    # Composite the blur in place onto the poster, starting from the specified offset.
+    # Only the rows of the blur that overlap the poster are blended.
+    poster.alpha_composite(blur, dest=(0, -offset_y), source=(0, 0, blur.width, poster_height + offset_y))
+    final_poster = poster
+
+    # Composite the pre-rendered title and static text onto the poster.
+    for overlay, overlay_position in (load_title_overlay(title_text, title_font_size, scale_factor),
+                                      load_static_overlay(scale_factor)):
+        final_poster.alpha_composite(overlay, dest=overlay_position)
 
-    # Save the final poster.
-    final_poster.save(output_image_path, format='PNG')
+    # Save the final poster, favouring encoding speed over file size.
+    final_poster.save(output_image_path, format='PNG', compress_level=1)
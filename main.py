@@ -1,8 +1,15 @@
+import hashlib
+import multiprocessing
 import os
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-from image_utils import create_image_poster
+from image_utils import create_image_poster, resolve_title_font_size
 from tmdb_utils import download_image, fetch_movie_images
 
+# Maximum number of images downloaded from TMDB at the same time.
+MAX_CONCURRENT_DOWNLOADS: int = 8
+
 
 def ensure_directories_exist(paths: list[str]) -> None:
     """
@@ -18,43 +25,152 @@ def ensure_directories_exist(paths: list[str]) -> None:
         os.makedirs(path, exist_ok=True)
 
 
-def create_movie_poster(movie_title: str, images: list[any], label: str, save_original: bool) -> None:
+def _output_image_path(label: str, i: int) -> str:
     """
-    Helper function to process a list of images (posters or backdrops).
+    Build the path of the final customized poster for an image.
 
     Args:
-        :param save_original: (bool) Whether to save the original poster or not.
         :param label: (str) Label to differentiate posters from backdrops in filenames.
-        :param images: (list[any]): A list of images to process.
+        :param i: (int) Index of the image within its list, used in filenames.
+
+    Returns:
+        str: The path where the final poster is saved.
+    """
+    return f"posters/final_movie_{label}_{i + 1}.png"
+
+
+def _download_one(image: dict[str, any], i: int, label: str, save_original: bool) -> tuple[str, bytes]:
+    """
+    Download a single image from TMDB and hash its content.
+
+    Args:
+        :param image: (dict[str, any]) The image entry returned by TMDB.
+        :param i: (int) Index of the image within its list, used in filenames.
+        :param label: (str) Label to differentiate posters from backdrops in filenames.
+        :param save_original: (bool) Whether to save the original poster or not.
+
+    Returns:
+        tuple[str, bytes]: The local path of the downloaded image and the hash of its content.
+    """
+    image_path = image['file_path']
+
+    # Define paths for original and final images.
+    if save_original:
+        original_image_path = f"originals/original_{label}_{i + 1}.jpg"
+        download_image(image_path, original_image_path)
+    else:
+        original_image_path = f"posters/temp_{label}_{i + 1}.jpg"
+        download_image(image_path, original_image_path)
+
+    # Hash the content so that identical images are only rendered once.
+    with open(original_image_path, 'rb') as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+
+    return original_image_path, digest
+
+
+def _render_one(
+        original_image_path: str,
+        i: int,
+        movie_title: str,
+        title_font_size: int,
+        label: str,
+        save_original: bool,
+        scale_factor: int) -> str:
+    """
+    Create the customized movie poster for a single downloaded image.
+
+    Args:
+        :param original_image_path: (str) The local path of the downloaded image.
+        :param i: (int) Index of the image within its list, used in filenames.
         :param movie_title: (str) The title of the movie.
+        :param title_font_size: (int) Font size of the movie title.
+        :param label: (str) Label to differentiate posters from backdrops in filenames.
+        :param save_original: (bool) Whether to save the original poster or not.
+        :param scale_factor: (int) Factor by which the poster is scaled down from full resolution.
 
     Returns:
-        None
+        str: The path where the final poster was saved.
     """
+    # Define output path for final customized poster.
+    output_image_path = _output_image_path(label, i)
+
+    print(f"Creating poster {output_image_path}")
+
+    # Create the movie poster with customized styling.
+    create_image_poster(
+        title_text=movie_title,
+        title_font_size=title_font_size,
+        poster_image_path=original_image_path,
+        blur_image_path="Blur.png",
+        output_image_path=output_image_path,
+        scale_factor=scale_factor
+    )
+
+    # Remove the temporary file if not saving the original.
+    if not save_original:
+        os.remove(original_image_path)
+
+    return output_image_path
+
 
-    for i, image in enumerate(images):
-        image_path = image['file_path']
+def create_movie_poster(
+        movie_title: str,
+        images: list[any],
+        label: str,
+        save_original: bool,
+        scale_factor: int = 1) -> None:
+    """
+    Helper function to process a list of images (posters or backdrops).
 
-        # Define paths for original and final images.
-        if save_original:
-            original_image_path = f"originals/original_{label}_{i + 1}.jpg"
-            download_image(image_path, original_image_path)
-        else:
-            original_image_path = f"posters/temp_{label}_{i + 1}.jpg"
-            download_image(image_path, original_image_path)
+    Images are downloaded concurrently, and each poster is rendered in a pool of worker processes
+    as soon as its image is downloaded, so that rendering overlaps with the remaining downloads.
+    Images whose content is identical to a previous one are not rendered again, their poster is copied instead.
 
-        # Define output path for final customized poster.
-        output_image_path = f"posters/final_movie_{label}_{i + 1}.png"
+    Args:
+        :param scale_factor: (int) Factor by which the posters are scaled down from full resolution.
+        :param save_original: (bool) Whether to save the original poster or not.
+        :param label: (str) Label to differentiate posters from backdrops in filenames.
+        :param images: (list[any]): A list of images to process.
+        :param movie_title: (str) The title of the movie.
 
-        print(f"Creating poster {output_image_path}")
+    Returns:
+        None
+    """
 
-        # Create the movie poster with customized styling.
-        create_image_poster(
-            title_text=movie_title,
-            poster_image_path=original_image_path,
-            blur_image_path="Blur.png",
-            output_image_path=output_image_path
-        )
+    # The title font size is the same for every image, so resolve it only once.
+    title_font_size = resolve_title_font_size(movie_title, scale_factor)
+
+    # Workers are spawned rather than forked, as the download threads may be running when they start.
+    with (ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS) as downloader,
+          ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")) as renderer):
+        downloads: dict[Future, int] = {
+            downloader.submit(_download_one, image, i, label, save_original): i
+            for i, image in enumerate(images)
+        }
+
+        # Hand each image over to the renderer as soon as it is downloaded, unless an identical one already was.
+        renders: dict[bytes, Future] = {}
+        duplicates: list[tuple[Future, int, str]] = []
+        for download in as_completed(downloads):
+            i = downloads[download]
+            original_image_path, digest = download.result()
+            if digest in renders:
+                duplicates.append((renders[digest], i, original_image_path))
+            else:
+                renders[digest] = renderer.submit(
+                    _render_one, original_image_path, i, movie_title, title_font_size, label, save_original,
+                    scale_factor)
+
+        # Wait for the results so that exceptions raised in workers are propagated.
+        for render in renders.values():
+            render.result()
+
+    # Copy the poster rendered for the first identical image to each duplicate.
+    for render, i, original_image_path in duplicates:
+        output_image_path = _output_image_path(label, i)
+        print(f"Copying poster {render.result()} to {output_image_path}")
+        shutil.copy(render.result(), output_image_path)
 
         # Remove the temporary file if not saving the original.
         if not save_original:
@@ -65,12 +181,14 @@ def generate_movie_posters(
         movie_title: str,
         movie_id: int,
         save_original: bool,
-        poster_languages: list[str] | None = None) -> None:
+        poster_languages: list[str] | None = None,
+        scale_factor: int = 1) -> None:
     """
     Fetch and process movie posters by downloading, optionally saving originals,
     and creating a customized movie poster for each image.
 
     Args:
+        :param scale_factor: (int) Factor by which the posters are scaled down from full resolution.
         :param poster_languages: (list[str] | None) List of languages of movie posters.
         :param movie_title: (str) The title of the movie.
         :param movie_id: (int) The unique identifier for the movie on TMDB.
@@ -95,7 +213,8 @@ def generate_movie_posters(
         print("No posters available for this movie.")
     else:
         print(f"-> Found {len(posters)} posters.")
-        create_movie_poster(movie_title=movie_title, images=posters, label="poster", save_original=save_original)
+        create_movie_poster(movie_title=movie_title, images=posters, label="poster", save_original=save_original,
+                            scale_factor=scale_factor)
 
     # Retrieve all backdrops available for the movie.
     backdrops: list[any] = movie_images.get('backdrops', [])
@@ -103,17 +222,20 @@ def generate_movie_posters(
         print("No backdrops available for this movie.")
     else:
         print(f"-> Found {len(backdrops)} backdrops.")
-        create_movie_poster(movie_title=movie_title, images=posters, label="backdrop", save_original=save_original)
+        create_movie_poster(movie_title=movie_title, images=backdrops, label="backdrop", save_original=save_original,
+                            scale_factor=scale_factor)
 
 
 POSTER_LANGUAGES: list[str] = ["en", "de", "fr", "it", "es", "null"]
 MOVIE_TITLE: str = "The Substance"
 MOVIE_ID: int = 933260
 SAVE_ORIGINAL: bool = False  # Set this to True if you want to save the original posters.
+SCALE_FACTOR: int = 1  # Set this to 2 to render posters at half resolution (1200x1470).
 
 if __name__ == "__main__":
     generate_movie_posters(
         movie_title=MOVIE_TITLE,
         movie_id=MOVIE_ID,
         save_original=SAVE_ORIGINAL,
-        poster_languages=POSTER_LANGUAGES)
+        poster_languages=POSTER_LANGUAGES,
+        scale_factor=SCALE_FACTOR)
@@ -1,3 +1,4 @@
+import json
 import os
 
 import requests
@@ -6,6 +7,45 @@ from dotenv import load_dotenv
 # Load environment variables.
 load_dotenv('.env.local')
 
+# Shared session so that connections to TMDB are kept alive and reused between requests.
+SESSION = requests.Session()
+
+# File where TMDB responses are cached along with their ETag, so that they are only transferred again when changed.
+RESPONSE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "cinefil", "tmdb.json")
+
+
+def load_response_cache() -> dict[str, dict[str, any]]:
+    """
+    Load the cached TMDB responses from disk.
+
+    Returns:
+        dict[str, dict[str, any]]: A dictionary mapping request URLs to their ETag and JSON body,
+        empty if the cache does not exist or cannot be read.
+    """
+    try:
+        with open(RESPONSE_CACHE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_response_cache(cache: dict[str, dict[str, any]]) -> None:
+    """
+    Save the cached TMDB responses to disk.
+
+    Args:
+        cache (dict[str, dict[str, any]]): A dictionary mapping request URLs to their ETag and JSON body.
+
+    Returns:
+        None
+    """
+    try:
+        os.makedirs(os.path.dirname(RESPONSE_CACHE_PATH), exist_ok=True)
+        with open(RESPONSE_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"Error saving response cache to {RESPONSE_CACHE_PATH}: {e}")
+
 
 def fetch_movie_images(movie_id: int, languages: list[str] | None = None) -> dict[str, any] | None:
     """
@@ -32,11 +72,28 @@ def fetch_movie_images(movie_id: int, languages: list[str] | None = None) -> dic
         "Authorization": f"Bearer {os.getenv('TMDB_API_TOKEN')}"
     }
 
+    # Make a conditional request if the response was cached, so that it is only sent again if it changed.
+    cache = load_response_cache()
+    cached_response = cache.get(url)
+    if cached_response:
+        headers["If-None-Match"] = cached_response["etag"]
+
     try:
         print(f"Fetching images for movie with id {movie_id}")
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers, timeout=30)
+        if response.status_code == 304 and cached_response:
+            return cached_response["body"]
+
         response.raise_for_status()
-        return response.json()
+        body = response.json()
+
+        # Cache the response if it can be revalidated later.
+        etag = response.headers.get("ETag")
+        if etag:
+            cache[url] = {"etag": etag, "body": body}
+            save_response_cache(cache)
+
+        return body
     except requests.RequestException as e:
         print(f"Error fetching images for movie ID {movie_id}: {e}")
         return None
@@ -57,9 +114,11 @@ def download_image(file_path: str, output_path: str) -> None:
     image_url = f"{base_url}{file_path}"
 
     try:
-        response = requests.get(image_url)
-        response.raise_for_status()
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
+        # Stream the image to disk in chunks instead of loading it fully into memory.
+        with SESSION.get(image_url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            with open(output_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    f.write(chunk)
     except requests.RequestException as e:
         print(f"Error downloading image from {image_url} to {output_path}: {e}")
\ No newline at end of file